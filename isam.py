@@ -0,0 +1,552 @@
+import struct, os, sys, bisect, mmap
+from array import array
+from operator import attrgetter
+from math import floor
+
+class Record:
+    FORMAT = 'i40sif15s'
+    SIZE_OF_RECORD = struct.calcsize(FORMAT)
+    _REC_STRUCT = struct.Struct(FORMAT)
+
+    def __init__(self, id: int, nombre: str, cantidad: int, precio: float, fecha: str):
+        self.id = id
+        self.nombre = nombre
+        self.cantidad = cantidad
+        self.precio = precio
+        self.fecha = fecha
+
+    # nombre y fecha guardan también su versión codificada de ancho fijo, que se calcula
+    # una vez al asignarlos y no en cada pack (un registro se reescribe con toda su página).
+    # Los registros leídos del disco conservan esos bytes tal cual y el str se decodifica
+    # sólo si se pide
+    @property
+    def nombre(self) -> str:
+        if self._nombre is None:
+            # errors='ignore': el corte a 40 bytes puede partir un carácter multibyte
+            self._nombre = self._nombre_b.decode(errors='ignore').rstrip()
+        return self._nombre
+
+    @nombre.setter
+    def nombre(self, nombre: str):
+        self._nombre = nombre
+        self._nombre_b = nombre.encode()[:40].ljust(40)
+
+    @property
+    def fecha(self) -> str:
+        if self._fecha is None:
+            self._fecha = self._fecha_b.decode(errors='ignore').rstrip()
+        return self._fecha
+
+    @fecha.setter
+    def fecha(self, fecha: str):
+        self._fecha = fecha
+        self._fecha_b = fecha.encode()[:15].ljust(15)
+
+    def _fields(self) -> tuple:
+        # valores en el orden de FORMAT, listos para struct
+        return (self.id, self._nombre_b, self.cantidad, self.precio, self._fecha_b)
+
+    def pack(self) -> bytes:
+        return Record._REC_STRUCT.pack(*self._fields())
+
+    def pack_into(self, buffer, offset: int) -> None:
+        # escribe el registro directamente en el buffer de la pagina (sin bytes intermedios)
+        Record._REC_STRUCT.pack_into(buffer, offset, *self._fields())
+
+    @staticmethod
+    def unpack(data: bytes):
+        return Record.unpack_from(data, 0)
+
+    @staticmethod
+    def unpack_from(buffer, offset: int):
+        return Record._from_fields(*Record._REC_STRUCT.unpack_from(buffer, offset))
+
+    @staticmethod
+    def _from_fields(id, nombre_b, cantidad, precio, fecha_b):
+        # sin pasar por los setters: los bytes del disco ya tienen el ancho fijo
+        record = Record.__new__(Record)
+        record.id, record.cantidad, record.precio = id, cantidad, precio
+        record._nombre_b, record._nombre = nombre_b, None
+        record._fecha_b, record._fecha = fecha_b, None
+        return record
+
+    def __str__(self):
+        return f"{self.id} | {self.nombre} | {self.cantidad} | {self.precio} | {self.fecha}"
+
+BUFFER_SIZE = 128 * 1024  # buffer de E/S para lecturas/escrituras secuenciales
+DISK_BLOCK_SIZE = 4096
+# tantos registros como entren en un bloque de disco junto al header (size, next_page): 61
+BLOCK_FACTOR = (DISK_BLOCK_SIZE - struct.calcsize('ii')) // Record.SIZE_OF_RECORD
+INDEX_FACTOR = 127
+
+class Page:
+    FORMAT_HEADER = 'ii' #size, next_page
+    SIZE_HEADER = struct.calcsize(FORMAT_HEADER)
+    _HDR_STRUCT = struct.Struct(FORMAT_HEADER)
+    # se rellena hasta múltiplo del bloque para que ninguna página quede partida entre dos bloques
+    SIZE_OF_PAGE = -(-(SIZE_HEADER + BLOCK_FACTOR * Record.SIZE_OF_RECORD) // DISK_BLOCK_SIZE) * DISK_BLOCK_SIZE
+    # Structs de página completa, uno por cantidad de registros n: leen/escriben los n registros
+    # (o sólo sus ids, saltando el resto de cada registro con 'x') en una única llamada en C
+    # en vez de un unpack_from/pack_into por registro desde Python
+    _REC_COLUMN = [struct.Struct('=' + Record.FORMAT * n) for n in range(BLOCK_FACTOR + 1)]
+    _ID_COLUMN = [struct.Struct('=' + 'i%dx' % (Record.SIZE_OF_RECORD - 4) * n) for n in range(BLOCK_FACTOR + 1)]
+
+    def __init__(self, records = None, next_page = -1):
+        # cada página tiene su propia lista (un default [] se compartiría entre todas)
+        self.records = [] if records is None else records
+        self.next_page = next_page
+
+    # Una página leída de disco guarda los bytes crudos + la columna de ids; los Record
+    # sólo se construyen cuando alguien accede a .records (búsquedas no los necesitan)
+    @property
+    def records(self):
+        if self._records is None:
+            values = Page._REC_COLUMN[self.size].unpack_from(self._raw, Page.SIZE_HEADER)
+            self._records = [Record._from_fields(*values[i:i + 5]) for i in range(0, len(values), 5)]
+            self._raw = None
+            self._ids = None
+        return self._records
+
+    @records.setter
+    def records(self, records):
+        self._records = records
+        self._raw = None
+        self._ids = None
+
+    @property
+    def size(self) -> int:
+        # cantidad de registros, sin materializar los Record de una página leída de disco
+        if self._records is None:
+            return len(self._ids)
+        return len(self._records)
+
+    def _ids_view(self):
+        if self._records is None:
+            return self._ids
+        return [record.id for record in self._records]
+
+    def record_at(self, i: int) -> Record:
+        if self._records is not None:
+            return self._records[i]
+        return Record.unpack_from(self._raw, Page.SIZE_HEADER + i * Record.SIZE_OF_RECORD)
+
+    def pack(self) -> bytearray:
+        # el bytearray ya viene en ceros, asi que el padding de los slots vacios es gratis
+        buf = bytearray(Page.SIZE_OF_PAGE)
+        self.pack_into(buf, 0, clear=False)
+        return buf
+
+    def pack_into(self, buffer, page_pos: int, clear: bool = True) -> None:
+        # 1- empaquetar el size y el next_page
+        Page._HDR_STRUCT.pack_into(buffer, page_pos, self.size, self.next_page)
+        # 2- todos los registros con un solo pack_into
+        fields = []
+        for record in self.records:
+            fields.extend(record._fields())
+        Page._REC_COLUMN[self.size].pack_into(buffer, page_pos + Page.SIZE_HEADER, *fields)
+        offset = page_pos + Page.SIZE_HEADER + self.size * Record.SIZE_OF_RECORD
+        if clear:
+            # sobre un buffer reutilizado (ej. mmap) hay que limpiar los slots que quedaron libres
+            end = page_pos + Page.SIZE_OF_PAGE
+            buffer[offset:end] = bytes(end - offset)
+
+    @staticmethod
+    def unpack(data: bytes):
+        return Page.unpack_from(data, 0)
+
+    @staticmethod
+    def unpack_from(buffer, page_pos: int):
+        size, next_page = Page._HDR_STRUCT.unpack_from(buffer, page_pos)
+        page = Page(next_page=next_page)
+        page._records = None
+        # copia propia de la página (el buffer puede ser un mmap que se cierra después)
+        page._raw = buffer[page_pos:page_pos + Page.SIZE_OF_PAGE]
+        page._ids = array('i', Page._ID_COLUMN[size].unpack_from(page._raw, Page.SIZE_HEADER))
+        return page
+
+    def position(self, record_id: int) -> int | None:
+        ids = self._ids_view()
+        pos = bisect.bisect_left(ids, record_id)
+
+        if pos < len(ids) and ids[pos] == record_id:
+            # Ya existe, terminamos la inserción
+            return None
+
+        # Si no existe, retornamos la posición de inserción
+        return pos
+
+
+class IndexFile:
+    FORMAT_HEADER = 'i'
+    SIZE_HEADER = struct.calcsize(FORMAT_HEADER)
+    _INT_STRUCT = struct.Struct('i')     # size, p0
+    _ENTRY_STRUCT = struct.Struct('ii')  # (k_i, p_i)
+    SIZE_OF_INDEX = SIZE_HEADER + _INT_STRUCT.size * INDEX_FACTOR + _INT_STRUCT.size * (INDEX_FACTOR + 1)
+
+    def __init__(self, file_name: str, pages = None, keys = None):
+        self.file_name = file_name
+        # cache en memoria del índice: pages = [p0, p1, ...], keys = [k1, k2, ...]
+        # (None = todavía no se cargó desde disco). Siempre array('i'): flush asigna en slices
+        self.pages = array('i', pages) if pages is not None else None
+        self.keys = array('i', keys) if keys is not None else None
+        self.dirty = False
+        self._dirty_from = None  # primera entrada de pages que difiere del disco
+        self._batch = 0
+
+    def __enter__(self):
+        # dentro de un "with" los cambios se quedan en memoria y se escriben una sola vez al salir
+        self.load()
+        self._batch += 1
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._batch -= 1
+        if self._batch == 0:
+            self.flush()
+        return False
+
+    def getIndex(self):
+        # una sola lectura de todo el archivo (sin buffer intermedio); luego se decodifica en memoria
+        fd = os.open(self.file_name, os.O_RDONLY | getattr(os, 'O_BINARY', 0))
+        try:
+            data = os.read(fd, os.fstat(fd).st_size)
+        finally:
+            os.close(fd)
+
+        size = self._INT_STRUCT.unpack_from(data, 0)[0]
+
+        # [p0][k1][p1][k2][p2]... se copia tal cual a un array de ints de C (4 bytes c/u,
+        # contiguos) y se separa en pares/impares: pages = [p0, p1, ...], keys = [k1, k2, ...]
+        entries = array('i')
+        entries.frombytes(data[self.SIZE_HEADER:self._entry_offset(size)])
+        pages = entries[0::2]
+        keys = entries[1::2]
+
+        return pages, keys
+
+    def load(self):
+        # lee el archivo una sola vez; las siguientes llamadas usan la cache
+        if self.pages is None:
+            if os.path.exists(self.file_name):
+                self.pages, self.keys = self.getIndex()
+            else:
+                self.pages, self.keys = array('i'), array('i')
+        return self.pages, self.keys
+
+    def _entry_offset(self, i: int) -> int:
+        # posición en disco de (k_i, p_i), i >= 1
+        return self.SIZE_HEADER + self._INT_STRUCT.size + self._ENTRY_STRUCT.size * (i - 1)
+
+    def flush(self):
+        if not self.dirty:
+            return
+
+        start = self._dirty_from if os.path.exists(self.file_name) else 0
+        if not self.pages:
+            # índice vacío (p. ej. bulk_load([])): sin archivo, que load ya trata como vacío
+            if os.path.exists(self.file_name):
+                os.remove(self.file_name)
+        elif start == 0:
+            # [size][p0][k1][p1]...[k_{m-1}][p_{m-1}] intercalado en un solo array
+            buf = array('i', bytes(self._entry_offset(len(self.pages))))
+            buf[0] = len(self.pages)
+            buf[1::2] = self.pages
+            buf[2::2] = self.keys
+
+            with open(self.file_name, 'wb') as file:
+                file.write(buf)
+        else:
+            # Sólo cambió la cola (caso típico: páginas nuevas agregadas al final):
+            # se escriben las entradas desde `start` y se parcha el size, sin reescribir el resto
+            buf = array('i', bytes(self._ENTRY_STRUCT.size * (len(self.pages) - start)))
+            buf[0::2] = self.keys[start - 1:]
+            buf[1::2] = self.pages[start:]
+
+            header = self._INT_STRUCT.pack(len(self.pages))
+            if hasattr(os, 'pwrite'):
+                # pwrite escribe en el offset indicado sin seek previo (1 syscall por escritura)
+                fd = os.open(self.file_name, os.O_WRONLY)
+                try:
+                    os.pwrite(fd, buf, self._entry_offset(start))
+                    os.pwrite(fd, header, 0)
+                finally:
+                    os.close(fd)
+            else:
+                with open(self.file_name, 'r+b') as file:
+                    file.seek(self._entry_offset(start))
+                    file.write(buf)
+                    file.seek(0)
+                    file.write(header)
+
+        self.dirty = False
+        self._dirty_from = None
+
+    def _changed(self, first: int):
+        # first = índice en pages de la primera entrada modificada
+        self.dirty = True
+        if self._dirty_from is None or first < self._dirty_from:
+            self._dirty_from = first
+        if self._batch == 0:
+            self.flush()
+
+    def addIndex(self, page_pos: int, key: int):
+        pages, keys = self.load()
+
+        if len(pages) == 0:
+            pages.append(page_pos)  # p0 no lleva clave
+        else:
+            keys.append(key)
+            pages.append(page_pos)
+        self._changed(len(pages) - 1)
+
+    def updateIndex(self, page_pos: int, key: int) -> bool:
+        # 1) Cargar índice en memoria
+        pages, keys = self.load()  # pages = [p0, p1, ..., p_{m-1}], keys = [k1, ..., k_{m-1}]
+
+        if len(pages) == 0:
+            return False  # índice vacío o corrupto
+
+        # 2) Buscar posición de inserción con upper_bound (después de duplicados)
+        #    pos ∈ [0 .. len(keys)]
+        pos = bisect.bisect_right(keys, key)  # insertar después de iguales
+
+        # 3) Insertar en las listas: keys[pos] se asocia con pages[pos + 1] (pages[0] es p0)
+        keys.insert(pos, key)
+        pages.insert(pos + 1, page_pos)
+
+        # 4) Persistir (o dejarlo pendiente si estamos dentro de un batch).
+        #    Si pos == len(keys) - 1 la entrada quedó al final y sólo se agregan 8 bytes.
+        self._changed(pos + 1)
+        return True
+
+    def updateIndexKey(self, page_pos: int, new_key: int) -> bool:
+        pages, keys = self.load()
+        if len(pages) <= 1:
+            return False  # sólo p0
+
+        # Estructura: keys[i - 1] es la clave de pages[i] para i >= 1
+        for i in range(1, len(pages)):
+            if pages[i] == page_pos:
+                keys[i - 1] = new_key
+                self._changed(i)
+                return True
+        return False
+
+    def search_position(self, record_id: int):
+        pages, keys = self.load()
+
+        if len(keys) == 0:
+            return "START"
+
+        # lower_bound: primera clave >= record_id (búsqueda binaria en C)
+        left = bisect.bisect_left(keys, record_id)
+
+        if left == len(keys):
+            return "END"
+
+        return left + 1
+
+    def find_page_for_search(self, record_id: int):
+        pages, keys = self.load()
+        if len(pages) == 0:
+            raise FileNotFoundError(self.file_name)
+
+        # upper_bound: cantidad de claves <= record_id. Cubre también los bordes:
+        # sin claves o record_id < keys[0] → 0 (p0); record_id >= keys[-1] → última página
+        left = bisect.bisect_right(keys, record_id)
+
+        # pages[0] es p0, keys[0] corresponde a pages[1]
+        return pages[left]
+
+    def scanAll(self):
+        try:
+            with open(self.file_name, 'rb') as file:
+                size = self._INT_STRUCT.unpack(file.read(self.SIZE_HEADER))[0]
+                print("Index Size = ", str(size))
+            pages, keys = self.getIndex()
+            print("Pages: ", end='')
+            for page in pages:
+                print(str(page), end=", ")
+            print()
+            print("Keys: ", end='')
+            for key in keys:
+                print(str(key), end=", ")
+        except FileNotFoundError:
+            print("File not found")
+
+class ISAM:
+    def __init__(self, file_name):
+        self.file_name = file_name
+        self.index = IndexFile("index.dat")
+
+    def _page_size(self) -> int:
+        return Page.SIZE_OF_PAGE
+
+    def _read_page(self, page_pos: int) -> Page:
+        # lectura de una sola página: sin buffer, el read va directo al bytes resultante
+        with open(self.file_name, 'rb', buffering=0) as f:
+            f.seek(page_pos)
+            data = f.read(self._page_size())
+        return Page.unpack(data)
+
+    def _write_page(self, page_pos: int, page: Page) -> None:
+        with open(self.file_name, 'r+b', buffering=0) as f:
+            f.seek(page_pos)
+            f.write(page.pack())
+
+    def _find_in_page(self, page: Page, record_id: int):
+        ids = page._ids_view()
+        pos = bisect.bisect_left(ids, record_id)
+        return pos, pos < len(ids) and ids[pos] == record_id
+
+    def add(self, record: Record):
+        """
+        Inserta un registro en su página. Con ids crecientes cada inserción cae al final de
+        la última página: se reescribe sólo esa página y, si está llena, se abre una nueva
+        al final del archivo (índice: append de una entrada), así que el costo es O(1).
+        """
+        indexf = self.index
+        if not os.path.exists(self.file_name) or os.path.getsize(self.file_name) == 0:
+            with open(self.file_name, 'wb') as file:
+                new_page = Page([record])
+                page_pos = file.tell()
+                indexf.addIndex(page_pos, record.id)
+                file.write(new_page.pack())
+            return
+
+        position = indexf.search_position(record.id)
+
+        with open(self.file_name, 'r+b', buffering=BUFFER_SIZE) as file:
+            pages, keys = indexf.load()
+            if position == "START" or position == "END":
+                # sin claves (sólo p0) o mayor que todas las claves: va a la última página
+                page_pos = pages[-1]
+            else:
+                page_pos = pages[position - 1]
+            is_last = page_pos == pages[-1]
+
+            # la página se lee y se reescribe directamente sobre el archivo mapeado (sin seek+read/write)
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_WRITE) as mm:
+                page = Page.unpack_from(mm, page_pos)
+                record_position = page.position(record.id)
+
+                if page.size + 1 > BLOCK_FACTOR:
+
+                    if is_last and record_position == page.size:
+                        # inserción ordenada: la página queda llena tal cual y el registro
+                        # empieza una página nueva (en vez de dejar dos páginas a la mitad)
+                        new_records = [record]
+                    else:
+                        # colocamos el nuevo (list.insert desplaza el resto con un solo memmove)
+                        page.records.insert(record_position, record)
+
+                        r1 = page.records[:len(page.records)//2]
+                        r2 = page.records[len(page.records)//2:]
+
+                        page.records = r1
+
+                        page.pack_into(mm, page_pos)
+                        new_records = r2
+
+                    file.seek(0, 2)
+                    new_page = Page(new_records)
+                    page_pos = file.tell()
+                    indexf.updateIndex(page_pos, new_records[0].id)
+                    file.write(new_page.pack())
+
+                    return "Added new Page at the end"
+
+                # colocamos el nuevo (list.insert desplaza el resto con un solo memmove)
+                page.records.insert(record_position, record)
+
+                page.pack_into(mm, page_pos)
+
+                return "Record inserted successfully"
+
+    def add_many(self, records):
+        # Se ordena primero para que cada add caiga en el camino rápido (final de la última
+        # página) en vez de partir páginas del medio; el índice se escribe una vez al final
+        with self.index:
+            for record in sorted(records, key=attrgetter('id')):
+                self.add(record)
+
+    def bulk_load(self, records):
+        # Carga inicial: se ordena una vez y se escriben páginas llenas de corrido,
+        # sin splits ni reescrituras del índice (1 write para la data, 1 para el índice)
+        records = sorted(records, key=attrgetter('id'))
+        num_pages = (len(records) + BLOCK_FACTOR - 1) // BLOCK_FACTOR
+
+        buf = bytearray(num_pages * Page.SIZE_OF_PAGE)
+        for i in range(num_pages):
+            page = Page(records[i * BLOCK_FACTOR:(i + 1) * BLOCK_FACTOR])
+            page.pack_into(buf, i * Page.SIZE_OF_PAGE, clear=False)
+
+        with open(self.file_name, 'wb') as file:
+            file.write(buf)
+
+        # p0 no lleva clave; k_i es el primer id de la página i
+        self.index.pages = array('i', range(0, num_pages * Page.SIZE_OF_PAGE, Page.SIZE_OF_PAGE))
+        self.index.keys = array('i', [r.id for r in records[BLOCK_FACTOR::BLOCK_FACTOR]])
+        self.index._changed(0)
+
+    def search(self, record_id: int):
+        """
+        Devuelve el Record si lo encuentra; None si no existe.
+        """
+        indexf = self.index
+        try:
+            page_pos = indexf.find_page_for_search(record_id)
+        except FileNotFoundError:
+            return None
+
+        # Leer la página correspondiente
+        page = self._read_page(page_pos)
+        pos, found = self._find_in_page(page, record_id)
+        if found:
+            return page.record_at(pos)
+        return None
+
+    def delete(self, record_id: int):
+        indexf = self.index
+        try:
+            page_pos = indexf.find_page_for_search(record_id)
+        except FileNotFoundError:
+            return False
+
+        # Cargar página y buscar binario dentro
+        page = self._read_page(page_pos)
+        pos, found = self._find_in_page(page, record_id)
+        if not found:
+            return False
+
+        # Borrar y reescribir la página
+        was_first = (pos == 0)
+        del page.records[pos]
+        self._write_page(page_pos, page)
+
+        # Si borré el primero y la página aún tiene registros, actualizar clave del índice
+        if was_first and page.size > 0:
+            new_first_key = page.records[0].id
+            indexf.updateIndexKey(page_pos, new_first_key)
+
+        # Si la página quedó vacía, la dejamos así (sin tocar el índice)
+        return True
+
+    def scanAll(self):
+        # Iterar en todas las paginas y mostrar la informacion de los registros
+        with open(self.file_name, 'rb') as file:
+            if os.fstat(file.fileno()).st_size == 0:
+                # mmap no admite largo 0: archivo vacío, no hay páginas que mostrar
+                print()
+                return
+            mm = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        with mm:
+            if hasattr(mm, 'madvise'):
+                mm.madvise(mmap.MADV_SEQUENTIAL)  # recorrido secuencial: que el SO lea por adelantado
+            numPages = len(mm) // Page.SIZE_OF_PAGE
+            print()
+            for i in range(numPages):
+                print("-- Page ", i + 1)
+                page = Page.unpack_from(mm, i * Page.SIZE_OF_PAGE)
+                # una sola escritura por página en vez de un print por registro
+                sys.stdout.write(''.join(f"{record}\n" for record in page.records))
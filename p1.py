@@ -1,504 +1,71 @@
-import struct, os, csv
-from math import floor
+import csv
+from isam import Record, ISAM, BUFFER_SIZE
 
-class Record:
-    FORMAT = 'i40sif15s'
-    SIZE_OF_RECORD = struct.calcsize(FORMAT)
+def demo():
+    isamf = ISAM("data.dat")
+    indexf = isamf.index
 
-    def __init__(self, id: int, nombre: str, cantidad: int, precio: float, fecha: str):
-        self.id = id
-        self.nombre = nombre
-        self.cantidad = cantidad
-        self.precio = precio
-        self.fecha = fecha
+    with open("sales_dataset_unsorted.csv", newline='', encoding="utf-8", buffering=BUFFER_SIZE) as csvfile:
+        reader = csv.reader(csvfile, delimiter=';')
+        next(reader)  # saltamos el encabezado
 
-    def pack(self) -> bytes:
-        return struct.pack(self.FORMAT,
-        self.id, self.nombre[:30].ljust(20).encode(),
-        self.cantidad, self.precio, self.fecha[:15].ljust(15).encode()
-        )
+        # row = [id, nombre, cantidad, precio, fecha]; nombre a 40 chars y fecha a 15.
+        # Los registros se generan a medida que bulk_load los consume (sin lista intermedia)
+        records = (Record(int(row[0]), row[1][:40], int(row[2]), float(row[3]), row[4][:15])
+                   for row in reader)
 
-    @staticmethod
-    def unpack(data: bytes):
-        id, nombre, cantidad, precio, fecha = struct.unpack(Record.FORMAT, data)
-        return Record(id, nombre.decode().rstrip(), cantidad, precio, fecha.decode().rstrip())
+        # carga masiva: páginas llenas + índice escritos de una sola vez
+        isamf.bulk_load(records)
 
-    def __str__(self):
-        return (str(self.id) + " | " + self.nombre + " | " + str(self.cantidad) + " | " +
-                str(self.precio) + " | " + str(self.fecha))
+    indexf.scanAll()
+    isamf.scanAll()
 
-BUFFER_SIZE = 1024
-BLOCK_FACTOR = 23
-INDEX_FACTOR = 127
+    print("\n=== PRUEBAS BÁSICAS DE SEARCH Y DELETE ===")
 
-class Page:
-    FORMAT_HEADER = 'ii' #size, next_page
-    SIZE_HEADER = struct.calcsize(FORMAT_HEADER)
-    SIZE_OF_PAGE = SIZE_HEADER + BLOCK_FACTOR * Record.SIZE_OF_RECORD
+    # IDs de prueba fijos
+    id_existente_250 = 250
+    id_existente_2 = 500
+    id_existente_3 = 1000
+    id_inexistente = 1500
 
-    def __init__(self, records = [], next_page = -1):
-        self.records = records
-        self.next_page = next_page
+    # --- SEARCH ---
+    print("\n-- SEARCH --")
+    res = isamf.search(id_existente_250)
+    print(f"Buscar {id_existente_250}: {'ENCONTRADO -> ' + str(res) if res else 'NO ENCONTRADO'}")
 
-    def pack(self) -> bytes:
-        # 1- empaquetar el size y el next_page
-        header_data = struct.pack(self.FORMAT_HEADER, len(self.records), self.next_page)
-        record_data = b''
-        for record in self.records:
-            record_data += record.pack()
-        i = len(self.records)
-        while i < BLOCK_FACTOR:
-            record_data += b'\x00' * Record.SIZE_OF_RECORD
-            i += 1
-        return header_data + record_data
+    res = isamf.search(id_existente_2)
+    print(f"Buscar {id_existente_2}: {'ENCONTRADO -> ' + str(res) if res else 'NO ENCONTRADO'}")
 
-    @staticmethod
-    def unpack(data: bytes):
-        size, next_page = struct.unpack(Page.FORMAT_HEADER, data[:Page.SIZE_HEADER])
-        offset = Page.SIZE_HEADER
-        records = []
-        for i in range(size):
-            record_data = data[offset : offset + Record.SIZE_OF_RECORD]
-            record = Record.unpack(record_data)
-            records.append(record)
-            offset += Record.SIZE_OF_RECORD
-        return Page(records, next_page)
+    res = isamf.search(id_existente_3)
+    print(f"Buscar {id_existente_3}: {'ENCONTRADO -> ' + str(res) if res else 'NO ENCONTRADO'}")
 
-    def position(self, record_id: int) -> int | None:
-        left, right = 0, len(self.records) - 1
+    res = isamf.search(id_inexistente)
+    print(f"Buscar {id_inexistente}: {'ENCONTRADO -> ' + str(res) if res else 'NO ENCONTRADO'}")
 
-        while left <= right:
-            mid = (left + right) // 2
-            mid_id = self.records[mid].id  # asumiendo que Record tiene atributo .id
+    # --- DELETE ---
+    print("\n-- DELETE --")
+    ok = isamf.delete(id_existente_2)
+    print(f"Eliminar {id_existente_2}: {'OK' if ok else 'NO ENCONTRADO'}")
 
-            if mid_id == record_id:
-                # Ya existe, terminamos la inserción
-                return None
-            elif mid_id < record_id:
-                left = mid + 1
-            else:
-                right = mid - 1
+    res = isamf.search(id_existente_2)
+    print(f"Re-buscar {id_existente_2}: {'ENCONTRADO -> ' + str(res) if res else 'NO ENCONTRADO'}")
 
-        # Si no existe, retornamos la posición de inserción
-        return left
+    # --- DELETE DEL PRIMER REGISTRO DE UNA PÁGINA ---
+    ok = isamf.delete(id_existente_250)
+    print(f"Eliminar {id_existente_250}: {'OK' if ok else 'NO ENCONTRADO'}")
 
+    res = isamf.search(id_existente_250)
+    print(f"Re-buscar {id_existente_250}: {'ENCONTRADO -> ' + str(res) if res else 'NO ENCONTRADO'}")
 
-class IndexFile:
-    FORMAT_HEADER = 'i'
-    SIZE_HEADER = struct.calcsize(FORMAT_HEADER)
-    SIZE_OF_INDEX = SIZE_HEADER + struct.calcsize('i') * INDEX_FACTOR + struct.calcsize('i') * (INDEX_FACTOR + 1)
+    # --- SANITY CHECK: un ID válido que debería seguir existiendo ---
+    res = isamf.search(id_existente_3)
+    print(f"Buscar {id_existente_3} (control): {'ENCONTRADO -> ' + str(res) if res else 'NO ENCONTRADO'}")
 
-    def __init__(self, file_name: str, pages = [], keys = []):
-        self.file_name = file_name
-        self.pages = pages
-        self.keys = keys
+    # Estado actual del índice y las páginas
+    print("\n-- ESTADO ACTUAL DEL ÍNDICE --")
+    indexf.scanAll()
+    print("\n-- ESTADO ACTUAL DE LAS PÁGINAS --")
+    isamf.scanAll()
 
-    def getIndex(self):
-        pages = []
-        keys = []
-        with open(self.file_name, 'rb') as file:
-            size = struct.unpack('i', file.read(4))[0]
-
-            if size == 1:
-                file.seek(4)
-                p0 = struct.unpack('i', file.read(4))[0]
-                pages.append(p0)
-            else:
-                file.seek(4)
-                p0 = struct.unpack('i', file.read(4))[0]
-                pages.append(p0)
-
-                for i in range(1, size):
-                    ki = struct.unpack('i', file.read(4))[0]
-                    keys.append(ki)
-                    pi = struct.unpack('i', file.read(4))[0]
-                    pages.append(pi)
-
-        return pages, keys
-
-    def addIndex(self, page_pos: int, key: int):
-        if not os.path.exists(self.file_name):
-            with open(self.file_name, 'wb') as file:
-                file.write(struct.pack(self.FORMAT_HEADER, 1))
-                file.write(struct.pack('i', page_pos))
-            return
-
-        with open(self.file_name, 'r+b') as file:
-            file.seek(0, 2)
-            file.write(struct.pack('i',key))
-            file.write(struct.pack('i', page_pos))
-            file.seek(0)
-            size = struct.unpack('i', file.read(4))[0]
-            size += 1
-            file.seek(0)
-            file.write(struct.pack(self.FORMAT_HEADER, size))
-
-    def updateIndex(self, page_pos: int, key: int) -> bool:
-        if not os.path.exists(self.file_name):
-            return False
-
-        # 1) Cargar índice en memoria
-        try:
-            pages, keys = self.getIndex()  # pages = [p0, p1, ..., p_{m-1}], keys = [k1, ..., k_{m-1}]
-        except FileNotFoundError:
-            return False
-
-        if len(pages) == 0:
-            return False  # índice corrupto
-
-        # 2) Buscar posición de inserción con upper_bound (después de duplicados)
-        #    pos ∈ [0 .. len(keys)]
-        left, right = 0, len(keys)  # nota: right es "one past the end" para upper_bound
-        while left < right:
-            mid = (left + right) // 2
-            if keys[mid] <= key:
-                left = mid + 1
-            else:
-                right = mid
-        pos = left  # insertar después de iguales
-
-        # 3) Construir nuevas listas insertadas
-        # keys: insertamos en pos
-        new_keys = keys[:pos] + [key] + keys[pos:]
-
-        # pages[1:]: pares asociados a keys; insertamos page_pos en el mismo pos
-        tail_pages = pages[1:]  # [p1, p2, ..., p_{m-1}]
-        new_tail_pages = tail_pages[:pos] + [page_pos] + tail_pages[pos:]
-
-        # Sanidad: tras insertar, deben tener misma longitud
-        assert len(new_keys) == len(new_tail_pages)
-
-        new_size = len(pages) + 1  # old_size = len(pages); sumamos 1 página nueva
-        p0 = pages[0]
-
-        # 4) Reescribir archivo completo
-        with open(self.file_name, 'r+b') as file:
-            file.seek(0)
-            file.write(struct.pack(self.FORMAT_HEADER, new_size))  # size
-            file.write(struct.pack('i', p0))  # p0
-            for ki, pi in zip(new_keys, new_tail_pages):  # (k_i, p_i) para i>=1
-                file.write(struct.pack('i', ki))
-                file.write(struct.pack('i', pi))
-            file.truncate(file.tell())
-
-        return True
-
-    def updateIndexKey(self, page_pos: int, new_key: int) -> bool:
-        if not os.path.exists(self.file_name):
-            return False
-
-        with open(self.file_name, 'r+b') as file:
-            size = struct.unpack('i', file.read(4))[0]
-            if size <= 1:
-                return False  # sólo p0
-
-            p0 = struct.unpack('i', file.read(4))[0]  # no se usa, pero avanzamos
-            # Estructura: [k1][p1][k2][p2]...
-            for _ in range(1, size):
-                k_offset = file.tell()  # posición de k_i
-                _ki = struct.unpack('i', file.read(4))[0]
-                pi = struct.unpack('i', file.read(4))[0]
-
-                if pi == page_pos:
-                    file.seek(k_offset)
-                    file.write(struct.pack('i', new_key))
-                    return True
-        return False
-
-    def search_position(self, record_id: int):
-        pages, keys = self.getIndex()
-
-        if len(keys) == 0:
-            return "START"
-
-        left, right = 0, len(keys) - 1
-
-        while left <= right:
-            mid = (left + right) // 2
-            if keys[mid] < record_id:
-                left = mid + 1
-            else:
-                right = mid - 1
-
-        if left == len(keys):
-            return "END"
-
-        return left + 1
-
-    def find_page_for_search(self, record_id: int):
-        pages, keys = self.getIndex()
-
-        # Caso: no hay claves → toda la data está en p0
-        if len(keys) == 0:
-            return pages[0]
-
-        # Si el record_id es menor que la primera clave, está en p0
-        if record_id < keys[0]:
-            return pages[0]
-
-        # Si es mayor que todas las claves, va a la última página
-        if record_id >= keys[-1]:
-            return pages[-1]
-
-        # Caso general → buscar página correcta
-        left, right = 0, len(keys) - 1
-        while left <= right:
-            mid = (left + right) // 2
-            if keys[mid] <= record_id:
-                left = mid + 1
-            else:
-                right = mid - 1
-
-        # pages[0] es p0, keys[0] corresponde a pages[1]
-        return pages[left]
-
-    def scanAll(self):
-        try:
-            with open(self.file_name, 'rb') as file:
-                size = struct.unpack(self.FORMAT_HEADER, file.read(self.SIZE_HEADER))[0]
-                print("Index Size = ", str(size))
-            pages, keys = self.getIndex()
-            print("Pages: ", end='')
-            for page in pages:
-                print(str(page), end=", ")
-            print()
-            print("Keys: ", end='')
-            for key in keys:
-                print(str(key), end=", ")
-        except FileNotFoundError:
-            print("File not found")
-
-class ISAM:
-    def __init__(self, file_name):
-        self.file_name = file_name
-
-    def _page_size(self) -> int:
-        return Page.SIZE_OF_PAGE
-
-    def _read_page(self, page_pos: int) -> Page:
-        with open(self.file_name, 'rb') as f:
-            f.seek(page_pos)
-            data = f.read(self._page_size())
-        return Page.unpack(data)
-
-    def _write_page(self, page_pos: int, page: Page) -> None:
-        with open(self.file_name, 'r+b') as f:
-            f.seek(page_pos)
-            f.write(page.pack())
-
-    def _find_in_page(self, page: Page, record_id: int):
-        left, right = 0, len(page.records) - 1
-        while left <= right:
-            mid = (left + right) // 2
-            mid_id = page.records[mid].id
-            if mid_id == record_id:
-                return mid, True
-            if mid_id < record_id:
-                left = mid + 1
-            else:
-                right = mid - 1
-        return left, False
-
-    def add(self, record: Record):
-        indexf = IndexFile("index.dat")
-        if not os.path.exists(self.file_name):
-            with open(self.file_name, 'wb') as file:
-                new_page = Page([record])
-                page_pos = file.tell()
-                indexf.addIndex(page_pos, record.id)
-                file.write(new_page.pack())
-            return
-
-        position = indexf.search_position(record.id)
-
-        with open(self.file_name, 'r+b') as file:
-            if position == "START" or position == "END":
-                file.seek(0, 2)
-                new_page = Page([record])
-                page_pos = file.tell()
-                indexf.addIndex(page_pos, record.id)
-                file.write(new_page.pack())
-                return "Added"
-            else:
-                pages, keys = indexf.getIndex()
-                page_pos = pages[position - 1]
-                file.seek(page_pos)
-                page = Page.unpack(file.read(Page.SIZE_OF_PAGE))
-
-                if len(page.records) + 1 > BLOCK_FACTOR:
-
-                    record_position = page.position(record.id)
-
-                    # crecemos en 1 para tener hueco
-                    page.records.append(page.records[-1] if page.records else record)
-
-                    # desplazamos a la derecha
-                    for i in range(len(page.records) - 1, record_position, -1):
-                        page.records[i] = page.records[i - 1]
-
-                    # colocamos el nuevo
-                    page.records[record_position] = record
-
-                    r1 = page.records[:len(page.records)//2]
-                    r2 = page.records[len(page.records)//2:]
-
-                    page.records = r1
-
-                    file.seek(page_pos)
-                    file.write(page.pack())
-
-                    file.seek(0, 2)
-                    new_page = Page(r2)
-                    page_pos = file.tell()
-                    indexf.updateIndex(page_pos, r2[0].id)
-                    file.write(new_page.pack())
-
-                    return "Added new Page at the end"
-
-                record_position = page.position(record.id)
-
-                # crecemos en 1 para tener hueco
-                page.records.append(page.records[-1] if page.records else record)
-
-                # desplazamos a la derecha
-                for i in range(len(page.records) - 1, record_position, -1):
-                    page.records[i] = page.records[i - 1]
-
-                # colocamos el nuevo
-                page.records[record_position] = record
-
-                file.seek(page_pos)
-                file.write(page.pack())
-
-                return "Record inserted successfully"
-
-    def search(self, record_id: int):
-        """
-        Devuelve el Record si lo encuentra; None si no existe.
-        """
-        indexf = IndexFile("index.dat")
-        try:
-            page_pos = indexf.find_page_for_search(record_id)
-        except FileNotFoundError:
-            return None
-
-        # Leer la página correspondiente
-        page = self._read_page(page_pos)
-        pos, found = self._find_in_page(page, record_id)
-        if found:
-            return page.records[pos]
-        return None
-
-    def delete(self, record_id: int):
-        indexf = IndexFile("index.dat")
-        try:
-            page_pos = indexf.find_page_for_search(record_id)
-        except FileNotFoundError:
-            return False
-
-        # Cargar página y buscar binario dentro
-        page = self._read_page(page_pos)
-        pos, found = self._find_in_page(page, record_id)
-        if not found:
-            return False
-
-        # Borrar y reescribir la página
-        was_first = (pos == 0)
-        del page.records[pos]
-        self._write_page(page_pos, page)
-
-        # Si borré el primero y la página aún tiene registros, actualizar clave del índice
-        if was_first and len(page.records) > 0:
-            new_first_key = page.records[0].id
-            indexf.updateIndexKey(page_pos, new_first_key)
-
-        # Si la página quedó vacía, la dejamos así (sin tocar el índice)
-        return True
-
-    def scanAll(self):
-        # Iterar en todas las paginas y mostrar la informacion de los registros
-        with open(self.file_name, 'rb') as file:
-            file.seek(0, 2)
-            numPages = file.tell() // Page.SIZE_OF_PAGE
-            file.seek(0, 0)
-            print()
-            for i in range(numPages):
-                print("-- Page ", i + 1)
-                page_data = file.read(Page.SIZE_OF_PAGE)
-                page = Page.unpack(page_data)
-                for record in page.records:
-                    print(record)
-
-## Main
-isamf = ISAM("data.dat")
-indexf = IndexFile("index.dat")
-
-records = []
-
-with open("sales_dataset_unsorted.csv", newline='', encoding="utf-8") as csvfile:
-    reader = csv.reader(csvfile, delimiter=';')
-    next(reader)  # saltamos el encabezado
-
-    for row in reader:
-        # row = [id, nombre, cantidad, precio, fecha]
-        id_prod = int(row[0])
-        nombre = row[1][:40]                 # ajustamos a 40 chars
-        cantidad = int(row[2])
-        precio = float(row[3])
-        fecha = row[4][:15]                  # ajustamos a 15 chars
-
-        record = Record(id_prod, nombre, cantidad, precio, fecha)
-        records.append(record)
-
-for record in records:
-    isamf.add(record)
-
-indexf.scanAll()
-isamf.scanAll()
-
-print("\n=== PRUEBAS BÁSICAS DE SEARCH Y DELETE ===")
-
-# IDs de prueba fijos
-id_existente_250 = 250
-id_existente_2 = 500
-id_existente_3 = 1000
-id_inexistente = 1500
-
-# --- SEARCH ---
-print("\n-- SEARCH --")
-res = isamf.search(id_existente_250)
-print(f"Buscar {id_existente_250}: {'ENCONTRADO -> ' + str(res) if res else 'NO ENCONTRADO'}")
-
-res = isamf.search(id_existente_2)
-print(f"Buscar {id_existente_2}: {'ENCONTRADO -> ' + str(res) if res else 'NO ENCONTRADO'}")
-
-res = isamf.search(id_existente_3)
-print(f"Buscar {id_existente_3}: {'ENCONTRADO -> ' + str(res) if res else 'NO ENCONTRADO'}")
-
-res = isamf.search(id_inexistente)
-print(f"Buscar {id_inexistente}: {'ENCONTRADO -> ' + str(res) if res else 'NO ENCONTRADO'}")
-
-# --- DELETE ---
-print("\n-- DELETE --")
-ok = isamf.delete(id_existente_2)
-print(f"Eliminar {id_existente_2}: {'OK' if ok else 'NO ENCONTRADO'}")
-
-res = isamf.search(id_existente_2)
-print(f"Re-buscar {id_existente_2}: {'ENCONTRADO -> ' + str(res) if res else 'NO ENCONTRADO'}")
-
-# --- DELETE DEL PRIMER REGISTRO DE UNA PÁGINA ---
-ok = isamf.delete(id_existente_250)
-print(f"Eliminar {id_existente_250}: {'OK' if ok else 'NO ENCONTRADO'}")
-
-res = isamf.search(id_existente_250)
-print(f"Re-buscar {id_existente_250}: {'ENCONTRADO -> ' + str(res) if res else 'NO ENCONTRADO'}")
-
-# --- SANITY CHECK: un ID válido que debería seguir existiendo ---
-res = isamf.search(id_existente_3)
-print(f"Buscar {id_existente_3} (control): {'ENCONTRADO -> ' + str(res) if res else 'NO ENCONTRADO'}")
-
-# Estado actual del índice y las páginas
-print("\n-- ESTADO ACTUAL DEL ÍNDICE --")
-indexf.scanAll()
-print("\n-- ESTADO ACTUAL DE LAS PÁGINAS --")
-isamf.scanAll()
+if __name__ == '__main__':
+    demo()
@@ -1,41 +1,82 @@
-import os, struct, bisect
+import os, struct, bisect, mmap
+from operator import attrgetter
 
-BLOCK_FACTOR = 3
+# Structs precompilados (el formato se parsea una sola vez). '<' fija little-endian y
+# tamaños estándar, sin padding dependiente de la plataforma.
+_REC = struct.Struct('<i40sif15s')   # id, nombre(40), cantidad, precio, fecha(15)
+_HDR = struct.Struct('<ii')          # size, next_page
+_IDX = struct.Struct('<ii')          # entrada del índice: key, pno
+_ID = struct.Struct('<i')            # sólo el id (primer campo de cada registro)
+
+# clave de la entrada de la página 0 (cabeza del chain) en el índice: menor que cualquier id,
+# así una inserción bajo la mínima no obliga a reescribir el índice
+KEY_MIN = -2 ** 31
+
+# Cada página ocupa bloques completos de disco: por defecto entran (4096 - 8) // 67 = 61
+# registros en un bloque. Se puede fijar otro BLOCK_FACTOR; el tamaño de página se redondea
+# al múltiplo de DISK_BLOCK_SIZE siguiente. Cambiarlo cambia el formato en disco: ISAM rechaza
+# archivos con otra geometría (ver ISAM.migrate / rebuild_from).
+DISK_BLOCK_SIZE = 4096
+BLOCK_FACTOR = (DISK_BLOCK_SIZE - _HDR.size) // _REC.size
 
 
 # ---------------- Record ----------------
 class Record:
     # Formato coherente con el pack (id, nombre(40), cantidad, precio(float), fecha(15))
-    FORMAT = 'i40sif15s'
-    SIZE_OF_RECORD = struct.calcsize(FORMAT)
+    FORMAT = _REC.format
+    SIZE_OF_RECORD = _REC.size
 
     def __init__(self, id: int, nombre: str, cantidad: int, precio: float, fecha: str):
         self.id = id
-        self.nombre = (nombre or "")[:40]
+        self.nombre = nombre
         self.cantidad = int(cantidad)
         self.precio = float(precio)
-        self.fecha = (fecha or "")[:15]
+        self.fecha = fecha
+
+    # nombre/fecha se guardan ya codificados (lo que va al disco); el str se decodifica
+    # sólo si alguien lo pide, así un registro leído y reescrito en un split no pasa por str
+    @property
+    def nombre(self) -> str:
+        if self._nombre is None:
+            self._nombre = self._nombre_b.decode(errors="ignore").rstrip('\x00').strip()
+        return self._nombre
+
+    @nombre.setter
+    def nombre(self, value: str):
+        self._nombre = (value or "")[:40]
+        self._nombre_b = self._nombre.encode('utf-8')[:40]
+
+    @property
+    def fecha(self) -> str:
+        if self._fecha is None:
+            self._fecha = self._fecha_b.decode(errors="ignore").rstrip('\x00').strip()
+        return self._fecha
+
+    @fecha.setter
+    def fecha(self, value: str):
+        self._fecha = (value or "")[:15]
+        self._fecha_b = self._fecha.encode('utf-8')[:15]
 
     def pack(self) -> bytes:
-        return struct.pack(
-            self.FORMAT,
-            self.id,
-            self.nombre.encode().ljust(40, b'\x00'),
-            self.cantidad,
-            self.precio,
-            self.fecha.encode().ljust(15, b'\x00')
-        )
+        # struct completa con \x00 los campos 40s/15s, no hace falta ljust
+        return _REC.pack(self.id, self._nombre_b, self.cantidad, self.precio, self._fecha_b)
+
+    def pack_into(self, buf, off: int):
+        # escribe el registro en su slot de un buffer ya reservado (sin bytes intermedios)
+        _REC.pack_into(buf, off, self.id, self._nombre_b, self.cantidad, self.precio, self._fecha_b)
+
+    @staticmethod
+    def unpack(data: bytes, off: int = 0):
+        # off permite leer el registro directo desde el buffer de la página, sin slicing
+        return Record._from_fields(*_REC.unpack_from(data, off))
 
     @staticmethod
-    def unpack(data: bytes):
-        id, nombre, cantidad, precio, fecha = struct.unpack(Record.FORMAT, data)
-        return Record(
-            id,
-            nombre.decode(errors="ignore").rstrip('\x00').strip(),
-            cantidad,
-            precio,
-            fecha.decode(errors="ignore").rstrip('\x00').strip()
-        )
+    def _from_fields(id, nombre_b, cantidad, precio, fecha_b):
+        rec = Record.__new__(Record)
+        rec.id, rec.cantidad, rec.precio = id, cantidad, precio
+        rec._nombre_b, rec._nombre = nombre_b, None
+        rec._fecha_b, rec._fecha = fecha_b, None
+        return rec
 
     def __repr__(self):
         return f"Record({self.id}, '{self.nombre}', {self.cantidad}, {self.precio}, '{self.fecha}')"
@@ -44,107 +85,271 @@ class Record:
 # ---------------- Page ----------------
 class Page:
     # header: size, next_page  (next_page = -1 si no hay)
-    FORMAT_HEADER = 'ii'
-    SIZE_HEADER = struct.calcsize(FORMAT_HEADER)
-    SIZE_OF_PAGE = SIZE_HEADER + BLOCK_FACTOR * Record.SIZE_OF_RECORD
+    FORMAT_HEADER = _HDR.format
+    SIZE_HEADER = _HDR.size
+    SIZE_OF_PAGE = -(-(SIZE_HEADER + BLOCK_FACTOR * Record.SIZE_OF_RECORD) // DISK_BLOCK_SIZE) * DISK_BLOCK_SIZE
+
+    # columna de ids: un Struct por cantidad de registros que salta el resto de cada registro ('x'),
+    # así todos los ids de una página salen de un solo unpack_from
+    _ID_COLUMN = [struct.Struct('<' + f'i{Record.SIZE_OF_RECORD - _ID.size}x' * n)
+                  for n in range(BLOCK_FACTOR + 1)]
+    # página completa: n registros seguidos en un solo Struct (un pack/unpack por página)
+    _REC_COLUMN = [struct.Struct('<' + _REC.format.lstrip('<') * n) for n in range(BLOCK_FACTOR + 1)]
 
     def __init__(self, records=None, next_page=-1):
         self.records = records or []
         self.next_page = next_page  # índice de página (0-based) o -1
 
     def pack(self) -> bytes:
-        buf = struct.pack(self.FORMAT_HEADER, len(self.records), self.next_page)
+        # buffer de la página completa; el padding ya viene en \x00
+        buf = bytearray(Page.SIZE_OF_PAGE)
+        self.pack_into(buf, 0)
+        return bytes(buf)
+
+    def pack_into(self, buf, base: int):
+        """Escribe la página en buf desde base (buf ya en cero: no se escribe el padding)."""
+        _HDR.pack_into(buf, base, len(self.records), self.next_page)
+        fields = []
         for r in self.records:
-            buf += r.pack()
-        # padding
-        remaining = BLOCK_FACTOR - len(self.records)
-        buf += b'\x00' * (remaining * Record.SIZE_OF_RECORD)
-        return buf
+            fields += (r.id, r._nombre_b, r.cantidad, r.precio, r._fecha_b)
+        Page._REC_COLUMN[len(self.records)].pack_into(buf, base + Page.SIZE_HEADER, *fields)
 
     @staticmethod
-    def unpack(data: bytes):
-        size, next_page = struct.unpack(Page.FORMAT_HEADER, data[:Page.SIZE_HEADER])
-        recs, off = [], Page.SIZE_HEADER
-        for _ in range(size):
-            recs.append(Record.unpack(data[off:off + Record.SIZE_OF_RECORD]))
-            off += Record.SIZE_OF_RECORD
+    def unpack(data, base: int = 0):
+        # data puede ser cualquier buffer (bytes, mmap, ...): se decodifica en sitio desde base
+        size, next_page = _HDR.unpack_from(data, base)
+        # un unpack_from para toda la página; las columnas salen de la tupla plana con slicing
+        flat = Page._REC_COLUMN[size].unpack_from(data, base + Page.SIZE_HEADER)
+        recs = list(map(Record._from_fields, flat[0::5], flat[1::5], flat[2::5], flat[3::5], flat[4::5]))
         return Page(recs, next_page)
 
+    @staticmethod
+    def unpack_meta(data, base: int = 0):
+        """Sólo el header: (size, next_page)."""
+        return _HDR.unpack_from(data, base)
+
+    @staticmethod
+    def ids(data, base: int = 0, size: int | None = None) -> tuple:
+        """Tupla con los ids de la página en base (un solo unpack_from); size evita releer el header."""
+        if size is None:
+            size = _HDR.unpack_from(data, base)[0]
+        return Page._ID_COLUMN[size].unpack_from(data, base + Page.SIZE_HEADER)
+
+
+def _search_chain(buf, pno: int, key: int):
+    """
+    Recorre el chain desde pno sobre el buffer del archivo de datos y devuelve el offset del
+    registro con id == key, o None. Sólo se decodifican headers e ids.
+    El chain está ordenado por id (un split deja la mitad alta en la página siguiente del chain),
+    así que la búsqueda termina en la primera página cuyo último id alcanza la clave.
+    """
+    while pno != -1:
+        base = pno * Page.SIZE_OF_PAGE
+        # el header se lee una vez por página: size para los ids, next_page para seguir
+        size, next_page = Page.unpack_meta(buf, base)
+        ids = Page.ids(buf, base, size)
+        if ids and ids[-1] >= key:
+            i = bisect.bisect_left(ids, key)
+            if ids[i] == key:
+                return base + Page.SIZE_HEADER + i * Record.SIZE_OF_RECORD
+            return None
+        pno = next_page
+    return None
+
+
+# pread/pwrite leen/escriben en un offset sin seek previo (1 syscall en vez de 2);
+# donde no existen (Windows) se vuelve a seek + read/write
+if hasattr(os, 'pread'):
+    def _pread(f, size: int, off: int) -> bytes:
+        return os.pread(f.fileno(), size, off)
+
+    def _pwrite(f, buf, off: int):
+        os.pwrite(f.fileno(), buf, off)
+else:
+    def _pread(f, size: int, off: int) -> bytes:
+        f.seek(off, 0)
+        return f.read(size)
+
+    def _pwrite(f, buf, off: int):
+        f.seek(off, 0)
+        f.write(buf)
+
 
 # ---------------- Data + Index ----------------
 class DataFile:
     def __init__(self, file_name):
         self.file_name = file_name
+        self._num_pages_cached = None  # se mantiene al escribir al final; None = leer del archivo
+        self._fh = None                # handle 'r+b' abierto una vez y reutilizado
+
+    def check_format(self):
+        """
+        Verifica que el archivo use la geometría de página actual: largo múltiplo de SIZE_OF_PAGE
+        y un header de página 0 coherente. Un archivo con otro BLOCK_FACTOR (p. ej. las páginas
+        antiguas de 3 registros) se leería mal y se sobrescribiría al insertar.
+        """
+        with open(self.file_name, 'rb') as f:
+            length = os.fstat(f.fileno()).st_size
+            header = f.read(Page.SIZE_HEADER)
+        if length == 0:
+            return
+        n = length // Page.SIZE_OF_PAGE
+        size, next_page = _HDR.unpack(header) if len(header) == Page.SIZE_HEADER else (-1, -1)
+        if length % Page.SIZE_OF_PAGE or not 0 <= size <= BLOCK_FACTOR or not -1 <= next_page < n:
+            raise ValueError(
+                f"{self.file_name}: no usa páginas de {Page.SIZE_OF_PAGE} bytes ({BLOCK_FACTOR} registros); "
+                f"migrarlo con ISAM.migrate() o rebuild_from()")
+
+    def _get_fh(self):
+        if self._fh is None:
+            self._fh = open(self.file_name, 'r+b')
+        return self._fh
+
+    def close(self):
+        if self._fh is not None:
+            self._fh.close()
+            self._fh = None
 
     # helpers de E/S de páginas
     def _num_pages(self, f):
-        f.seek(0, 2)
-        return (f.tell() // Page.SIZE_OF_PAGE)
+        if self._num_pages_cached is None:
+            self._num_pages_cached = os.fstat(f.fileno()).st_size // Page.SIZE_OF_PAGE
+        return self._num_pages_cached
+
+    def open_ro_mmap(self):
+        """Vista de sólo lectura del archivo completo, o None si está vacío (mmap no admite largo 0)."""
+        f = self._get_fh()
+        f.flush()
+        if os.fstat(f.fileno()).st_size == 0:
+            return None
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    @staticmethod
+    def _read_page_mm(mm, page_no: int) -> Page:
+        # sin seek ni read: la página se decodifica directo desde el mapeo
+        return Page.unpack(mm, page_no * Page.SIZE_OF_PAGE)
 
-    def _read_page(self, f, page_no: int) -> Page:
-        f.seek(page_no * Page.SIZE_OF_PAGE, 0)
-        return Page.unpack(f.read(Page.SIZE_OF_PAGE))
+    @staticmethod
+    def _num_pages_mm(mm) -> int:
+        return len(mm) // Page.SIZE_OF_PAGE if mm is not None else 0
 
-    def _write_page(self, f, page_no: int, page: Page):
-        f.seek(page_no * Page.SIZE_OF_PAGE, 0)
-        f.write(page.pack())
+    def _write_raw(self, f, first_no: int, buf):
+        """Escribe páginas ya empaquetadas (len(buf) múltiplo de SIZE_OF_PAGE) desde first_no."""
+        _pwrite(f, buf, first_no * Page.SIZE_OF_PAGE)
+        if self._num_pages_cached is not None:
+            self._num_pages_cached = max(self._num_pages_cached, first_no + len(buf) // Page.SIZE_OF_PAGE)
 
     def _append_page(self, f, page: Page) -> int:
         """Escribe una página al final. Retorna su número de página."""
         pno = self._num_pages(f)
-        f.seek(pno * Page.SIZE_OF_PAGE, 0)
-        f.write(page.pack())
+        _pwrite(f, page.pack(), pno * Page.SIZE_OF_PAGE)
+        self._num_pages_cached = pno + 1
         return pno
 
 
 class IndexFile:
     # clave mínima de página primaria + número de página
-    FORMAT = 'ii'
-    SIZE = struct.calcsize(FORMAT)
+    FORMAT = _IDX.format
+    SIZE = _IDX.size
 
     def __init__(self, file_name):
         self.file_name = file_name
+        # cache del índice parseado; se revalida contra (mtime, size) del archivo
+        self._entries = None
+        self._keys = None   # keys[i] y pnos[i] son la entrada i (ordenadas por key)
+        self._pnos = None
+        self._mtime = None
+        self._deferred = False  # True durante un batch: los cambios quedan sólo en memoria
+
+    def invalidate(self):
+        """Descarta la cache; llamar después de escribir el archivo de índice."""
+        self._entries = self._keys = self._pnos = self._mtime = None
+
+    def _set_cache(self, entries):
+        self._entries = entries
+        self._keys = [k for k, _ in entries]
+        self._pnos = [p for _, p in entries]
+
+    def _stamp(self):
+        # tras escribir nosotros mismos el archivo, la cache sigue siendo válida
+        st = os.stat(self.file_name)
+        self._mtime = (st.st_mtime_ns, st.st_size)
+
+    def write_all(self, entries):
+        """Reemplaza el índice completo por `entries` [(key, pno), ...]."""
+        self._set_cache(sorted(entries))
+        if not self._deferred:
+            with open(self.file_name, 'wb') as ix:
+                ix.write(b''.join(_IDX.pack(k, p) for k, p in self._entries))
+            self._stamp()
 
     def build(self, data_path: str):
+        self.invalidate()
         if not os.path.exists(data_path):
             return
-        with open(data_path, 'rb') as df, open(self.file_name, 'wb') as ix:
-            n = (os.path.getsize(data_path) // Page.SIZE_OF_PAGE)
-            for pno in range(n):
-                pg = Page.unpack(df.read(Page.SIZE_OF_PAGE) if pno == 0 else
-                                 (df.seek(pno * Page.SIZE_OF_PAGE, 0) or df.read(Page.SIZE_OF_PAGE)))
-                if pg.records:
-                    first_key = pg.records[0].id
-                    ix.write(struct.pack(self.FORMAT, first_key, pno))
+        # las páginas son contiguas: una lectura secuencial y sólo se decodifica header + primer id
+        with open(data_path, 'rb') as df:
+            raw = df.read()
+        n = len(raw) // Page.SIZE_OF_PAGE
+        out = bytearray(n * _IDX.size)
+        off = 0
+        for pno in range(n):
+            base = pno * Page.SIZE_OF_PAGE
+            size, _ = Page.unpack_meta(raw, base)
+            if size > 0:
+                first_key = _REC.unpack_from(raw, base + Page.SIZE_HEADER)[0] if pno else KEY_MIN
+                _IDX.pack_into(out, off, first_key, pno)
+                off += _IDX.size
+        with open(self.file_name, 'wb') as ix:
+            ix.write(memoryview(out)[:off])
 
     def _load_all(self):
-        entries = []
-        if not os.path.exists(self.file_name):
-            return entries
+        if self._deferred and self._entries is not None:
+            return self._entries
+        try:
+            st = os.stat(self.file_name)
+        except FileNotFoundError:
+            self.invalidate()
+            return []
+        stamp = (st.st_mtime_ns, st.st_size)
+        if self._entries is not None and stamp == self._mtime:
+            return self._entries
+
+        # una sola lectura; iter_unpack recorre las entradas (key, pno) en C
         with open(self.file_name, 'rb') as f:
-            while chunk := f.read(self.SIZE):
-                entries.append(struct.unpack(self.FORMAT, chunk))  # (key, pno)
-        return entries
+            data = f.read()
+        # en disco las entradas de los splits van agregadas al final; en memoria, ordenadas por key
+        self._set_cache(sorted(_IDX.iter_unpack(data)))
+        self._mtime = stamp
+        return self._entries
 
     def find_page_for_key(self, key: int) -> int | None:
         """Devuelve la página primaria donde debería caer la clave."""
         entries = self._load_all()
         if not entries:
             return 0  # si no hay índice, asumimos página 0 (se creará)
-        # buscamos el mayor key <= buscada
-        best = None
-        for k, p in entries:
-            if k <= key:
-                best = p
-            else:
-                break
-        return best if best is not None else entries[0][1]
+        # buscamos el mayor key <= buscada (las entradas están ordenadas por key)
+        idx = bisect.bisect_right(self._keys, key) - 1
+        return self._pnos[idx] if idx >= 0 else self._pnos[0]
 
     def update_on_split(self, old_first_key: int, new_first_key: int, new_page_no: int):
-        """Solo si la nueva página va a ser primaria. Para overflow clásico NO hace falta."""
-        # En ISAM clásico con overflow encadenado NO cambiamos el índice,
-        # porque sigue apuntando a la página primaria. Dejo la función por si luego decides promover.
-        pass
+        """
+        Registra la página nueva de un split. La página partida conserva su mínima
+        (old_first_key, su entrada no cambia) y la nueva cubre desde new_first_key, así que
+        cada clave sigue llevando a la página que la contiene.
+        """
+        self._load_all()
+        if self._entries is None:
+            self._set_cache([])
+        i = bisect.bisect_right(self._keys, new_first_key)
+        self._entries.insert(i, (new_first_key, new_page_no))
+        self._keys.insert(i, new_first_key)
+        self._pnos.insert(i, new_page_no)
+        if not self._deferred:
+            # append O(1): el orden se rehace en memoria al cargar
+            with open(self.file_name, 'ab') as ix:
+                ix.write(_IDX.pack(new_first_key, new_page_no))
+            self._stamp()
 
 
 # ---------------- ISAM con split + overflow encadenado ----------------
@@ -156,101 +361,192 @@ class ISAM:
         if not os.path.exists(data_path):
             with open(data_path, 'wb') as f:
                 pass
+        else:
+            self.data.check_format()
+
+    def close(self):
+        self.data.close()
 
-    def _insert_into_page_sorted(self, page: Page, rec: Record):
-        # Inserta manteniendo ORDEN LOCAL de esa página (no toca otras páginas)
-        keys = [r.id for r in page.records]
-        pos = bisect.bisect_left(keys, rec.id)
-        page.records.insert(pos, rec)
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
 
     def insert(self, rec: Record):
+        f = self.data._get_fh()
+        self._insert(f, rec)
+        f.flush()
+
+    def insert_batch(self, records):
+        """
+        Inserta muchos registros abriendo el archivo de datos una sola vez. Se ordenan por id
+        antes de insertar y el índice se mantiene en memoria y se escribe una sola vez al final.
+        Si el archivo está vacío se usa bulk_load (páginas llenas, sin splits).
+        """
+        if self.data._num_pages(self.data._get_fh()) == 0:
+            return self.bulk_load(records)
+        self.index._load_all()
+        self.index._deferred = True
+        try:
+            f = self.data._get_fh()
+            for rec in sorted(records, key=attrgetter('id')):
+                self._insert(f, rec)
+            f.flush()
+        finally:
+            self.index._deferred = False
+            self.index.write_all(self.index._entries or [])
+
+    def bulk_load(self, records):
+        """
+        Reemplaza el contenido por `records`: se ordenan por id y se empaquetan en páginas llenas
+        y encadenadas en orden, con una sola escritura de datos y una del índice (sin splits).
+        """
+        records = sorted(records, key=attrgetter('id'))
+        n = (len(records) + BLOCK_FACTOR - 1) // BLOCK_FACTOR
+        buf = bytearray(n * Page.SIZE_OF_PAGE)
+        entries = []
+        for pno in range(n):
+            chunk = records[pno * BLOCK_FACTOR:(pno + 1) * BLOCK_FACTOR]
+            Page(chunk, pno + 1 if pno + 1 < n else -1).pack_into(buf, pno * Page.SIZE_OF_PAGE)
+            entries.append((chunk[0].id if pno else KEY_MIN, pno))
+
+        f = self.data._get_fh()
+        f.truncate(0)
+        if buf:
+            _pwrite(f, buf, 0)
+        f.flush()
+        self.data._num_pages_cached = n
+        self.index.write_all(entries)
+
+    @staticmethod
+    def _read_old_records(old_data_path: str, old_block_factor: int):
+        # páginas de la geometría vieja, sin padding: header + old_block_factor registros
+        page_size = Page.SIZE_HEADER + old_block_factor * Record.SIZE_OF_RECORD
+        with open(old_data_path, 'rb') as old:
+            raw = old.read()
+        records = []
+        for base in range(0, len(raw) - page_size + 1, page_size):
+            size = _HDR.unpack_from(raw, base)[0]
+            off = base + Page.SIZE_HEADER
+            for i in range(size):
+                records.append(Record.unpack(raw, off + i * Record.SIZE_OF_RECORD))
+        return records
+
+    def rebuild_from(self, old_data_path: str, old_block_factor: int = 3):
+        """
+        Carga los registros de otro archivo de datos escrito con otra geometría de página (por
+        defecto la antigua de 3 registros sin padding) con bulk_load, que reemplaza datos e índice.
+        """
+        self.bulk_load(ISAM._read_old_records(old_data_path, old_block_factor))
+
+    @classmethod
+    def migrate(cls, data_path='data.dat', index_path='index.dat', old_block_factor: int = 3):
+        """
+        Migra en sitio un archivo con la geometría vieja (que el constructor rechaza): lee los
+        registros, vacía el archivo y los vuelve a cargar. Retorna el ISAM abierto.
+        """
+        records = cls._read_old_records(data_path, old_block_factor)
+        open(data_path, 'wb').close()
+        isam = cls(data_path, index_path)
+        isam.bulk_load(records)
+        return isam
+
+    def _insert(self, f, rec: Record):
+        # si no hay páginas, crea una primaria
+        if self.data._num_pages(f) == 0:
+            self.data._append_page(f, Page([rec], -1))
+            # índice inicial
+            self.index.write_all([(KEY_MIN, 0)])
+            return
+
+        # sin índice (borrado o vacío) pero con páginas: reconstruirlo antes de rutear
+        if not self.index._load_all():
+            self.index.build(self.data.file_name)
+
         # 1) localizar página primaria por índice
-        target = self.index.find_page_for_key(rec.id)
-        with open(self.data.file_name, 'r+b') as f:
-            # si no hay páginas, crea una primaria
-            if self.data._num_pages(f) == 0:
-                self.data._append_page(f, Page([rec], -1))
-                # índice inicial
-                with open(self.index.file_name, 'wb') as ix:
-                    ix.write(struct.pack(self.index.FORMAT, rec.id, 0))
-                return
-
-            # 2) recorrer chain: primaria -> overflows hasta ubicar lugar
-            cur_no = target
-            while True:
-                cur_pg = self.data._read_page(f, cur_no)
-
-                # si la clave cae antes que el primer registro de esta página y es PRIMARIA,
-                # podrías (opcional) insertar aquí para mantener mínima. (lo normal: cae aquí igual)
-                self._insert_into_page_sorted(cur_pg, rec)
-
-                if len(cur_pg.records) <= BLOCK_FACTOR:
-                    # hay espacio: escribir y listo
-                    self.data._write_page(f, cur_no, cur_pg)
-                    break
-                else:
-                    # 3) página llena -> split en DOS sin tocar el resto del archivo
-                    #    mitad "baja" se queda; mitad "alta" va a nueva página encadenada
-                    #    garantizamos que la primera página conserva su mínima (índice no cambia)
-                    mid = (len(cur_pg.records) + 1) // 2  # sesgo para que primaria conserve mínimas
-                    low = cur_pg.records[:mid]
-                    high = cur_pg.records[mid:]
-
-                    # reescribir la página actual con 'low'
-                    cur_pg.records = low
-
-                    # nueva página apunta al siguiente del chain
-                    new_pg = Page(high, cur_pg.next_page)
-                    new_no = self.data._append_page(f, new_pg)
-
-                    # encadenar
-                    cur_pg.next_page = new_no
-                    self.data._write_page(f, cur_no, cur_pg)
-
-                    # Si el registro insertado quedó en 'high', ya está en new_pg y terminamos.
-                    # Si no, también terminamos: el split local resolvió la sobrecarga.
-                    break
-
-            # 4) reconstruir índice solo si no existe (o si quieres, lo puedes rebuild al final del batch)
-            if not os.path.exists(self.index.file_name) or os.path.getsize(self.index.file_name) == 0:
-                self.index.build(self.data.file_name)
+        cur_no = self.index.find_page_for_key(rec.id)
+
+        # 2) se trabaja sobre los bytes de la página: sólo se codifica el registro nuevo,
+        #    los demás se mueven como bloques sin pasar por Record
+        R, H = Record.SIZE_OF_RECORD, Page.SIZE_HEADER
+        raw = bytearray(_pread(f, Page.SIZE_OF_PAGE, cur_no * Page.SIZE_OF_PAGE))
+        size, next_page = Page.unpack_meta(raw)
+        ins = H + bisect.bisect_left(Page.ids(raw, 0, size), rec.id) * R
+        end = H + size * R
+
+        if size < BLOCK_FACTOR:
+            # hay espacio: correr la cola un registro y escribir el nuevo en el hueco
+            raw[ins + R:end + R] = raw[ins:end]
+            rec.pack_into(raw, ins)
+            _HDR.pack_into(raw, 0, size + 1, next_page)
+            self.data._write_raw(f, cur_no, raw)
+            return
+
+        # 3) página llena -> split en DOS sin tocar el resto del archivo
+        #    mitad "baja" se queda; mitad "alta" va a nueva página encadenada
+        #    garantizamos que la primera página conserva su mínima (su entrada no cambia)
+        recs = raw[H:ins] + rec.pack() + raw[ins:end]
+        mid = (size + 2) // 2  # sesgo para que primaria conserve mínimas
+        cut = mid * R
+
+        # nueva página (al final del archivo) con 'high'; apunta al siguiente del chain
+        new_no = self.data._num_pages(f)
+        new_raw = bytearray(Page.SIZE_OF_PAGE)
+        new_raw[H:H + len(recs) - cut] = recs[cut:]
+        _HDR.pack_into(new_raw, 0, size + 1 - mid, next_page)
+
+        # la página actual se queda con 'low' y se encadena a la nueva
+        raw[H:end] = recs[:cut] + bytes(end - H - cut)
+        _HDR.pack_into(raw, 0, mid, new_no)
+
+        if new_no == cur_no + 1:
+            # la partida es la última página: ambas quedan contiguas, un solo write
+            self.data._write_raw(f, cur_no, raw + new_raw)
+        else:
+            self.data._write_raw(f, new_no, new_raw)
+            self.data._write_raw(f, cur_no, raw)
+
+        # 4) la nueva página cubre desde su primer id: entrada propia en el índice
+        self.index.update_on_split(_ID.unpack_from(recs, 0)[0], _ID.unpack_from(recs, cut)[0], new_no)
 
     # Búsqueda: índice -> primaria -> overflow encadenado
     def search(self, key: int):
         pno = self.index.find_page_for_key(key)
         if pno is None:
             return None
-        with open(self.data.file_name, 'rb') as f:
-            while pno != -1:
-                pg = self.data._read_page(f, pno)
-                for r in pg.records:
-                    if r.id == key:
-                        return r
-                pno = pg.next_page
-        return None
+        mm = self.data.open_ro_mmap()
+        if mm is None:
+            return None
+        with mm:
+            off = _search_chain(mm, pno, key)
+            return Record.unpack(mm, off) if off is not None else None
 
     # solo para debug
     def scanAll(self):
-        with open(self.data.file_name, 'rb') as f:
-            n = self.data._num_pages(f)
-            for i in range(n):
-                pg = self.data._read_page(f, i)
-                chain = f"(next={pg.next_page})"
-                print(f"-- Page {i} {chain}")
-                for r in pg.records:
-                    print("   ", r)
+        mm = self.data.open_ro_mmap()
+        if mm is not None:
+            with mm:
+                for i in range(self.data._num_pages_mm(mm)):
+                    pg = self.data._read_page_mm(mm, i)
+                    chain = f"(next={pg.next_page})"
+                    print(f"-- Page {i} {chain}")
+                    for r in pg.records:
+                        print("   ", r)
         print("== Index ==")
         for k, p in self.index._load_all():
-            print(f"  key_min={k} -> page {p}")
-
-isam = ISAM('data.dat', 'index.dat')
-
-# Inserciones desordenadas: NO reescribe todo, solo divide la página si se llena
-isam.insert(Record(10, "A", 1, 1.0, "2024-01-01"))
-isam.insert(Record(2,  "B", 2, 2.0, "2024-01-02"))
-isam.insert(Record(7,  "C", 3, 3.0, "2024-01-03"))
-isam.insert(Record(1,  "D", 4, 4.0, "2024-01-04"))
-isam.insert(Record(12, "E", 5, 5.0, "2024-01-05"))
-isam.insert(Record(5,  "F", 6, 6.0, "2024-01-06"))
-isam.insert(Record(6,  "G", 7, 7.0, "2024-01-07"))
-isam.scanAll()
+            print(f"  key_min={'-inf' if k == KEY_MIN else k} -> page {p}")
+
+if __name__ == '__main__':
+    isam = ISAM('data.dat', 'index.dat')
+
+    # Inserciones desordenadas: NO reescribe todo, solo divide la página si se llena
+    isam.insert(Record(10, "A", 1, 1.0, "2024-01-01"))
+    isam.insert(Record(2,  "B", 2, 2.0, "2024-01-02"))
+    isam.insert(Record(7,  "C", 3, 3.0, "2024-01-03"))
+    isam.insert(Record(1,  "D", 4, 4.0, "2024-01-04"))
+    isam.insert(Record(12, "E", 5, 5.0, "2024-01-05"))
+    isam.insert(Record(5,  "F", 6, 6.0, "2024-01-06"))
+    isam.insert(Record(6,  "G", 7, 7.0, "2024-01-07"))
+    isam.scanAll()
+    isam.close()